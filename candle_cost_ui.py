@@ -1,9 +1,26 @@
+import atexit
 import copy
 import json
+import logging
 import os
-from datetime import datetime
+import sqlite3
+import threading
+import time
+from collections.abc import MutableMapping
+from functools import lru_cache
+from types import MappingProxyType
+from typing import NamedTuple
+import numpy as np
+import pandas as pd
 import streamlit as st
 
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson  # optional: much faster JSON encode/decode
+except ImportError:
+    orjson = None
+
 # =========================
 # Files for persistence
 # =========================
@@ -11,7 +28,12 @@ import streamlit as st
 SCENTS_FILE = "scents.json"
 BLENDS_FILE = "blends.json"
 CONTAINERS_FILE = "containers.json"
-INVENTORY_FILE = "inventory.json"
+INVENTORY_FILE = "inventory.json"  # legacy; imported into INVENTORY_DB on first run
+INVENTORY_DB = "inventory.db"
+
+# Saves are coalesced: the latest payload per file is written once this
+# many seconds after the last edit.
+SAVE_DELAY_SECONDS = 0.5
 
 # =========================
 # Base constants & defaults
@@ -22,49 +44,198 @@ DEFAULT_WAX_COST_PER_OZ = 157.64 / 720  # $157.64 for 45 lb (720 oz) of wax (no
 DEFAULT_WATER_TO_WAX_RATIO = 0.90       # 1 oz water ≈ 0.9 oz wax
 DEFAULT_FRAGRANCE_LOAD = 0.08           # 8%
 
-# Base fragrance oil costs per ounce (oil + shipping where given)
-BASE_SCENTS = {
+# Base fragrance oil costs per ounce (oil + shipping where given).
+# Read-only; sessions work on their own dict(BASE_SCENTS) copy.
+BASE_SCENTS = MappingProxyType({
     # internal_name: cost_per_oz
     "bonfire_embers":   38.87 / 16,  # $29.04 + 9.83 shipping, 16 oz
     "lavender":         24.71 / 15,
     "leather":          27.63 / 16,
     "white_eucalyptus": 32.20 / 16,
     "sandalwood":       25.91 / 15,
-}
+})
+_BASE_SCENT_KEYS = frozenset(BASE_SCENTS)
 
 # Wick costs per piece, including share of shipping
 # 34 total wicks, $7.50 shipping => 7.50 / 34 ≈ 0.2206 per wick extra
 SHIPPING_PER_WICK = 7.50 / 34.0
-BASE_WICKS = {
+BASE_WICKS = MappingProxyType({
     "wood_30mm": 1.25 + SHIPPING_PER_WICK,           # ≈ 1.47
     "wood_20mm": (8.25 / 10) + SHIPPING_PER_WICK,    # ≈ 1.05
     "cdn12":     (7.50 / 10) + SHIPPING_PER_WICK,    # ≈ 0.97
     "cdn16":     (5.00 / 10) + SHIPPING_PER_WICK,    # ≈ 0.72
-}
+})
+# Display labels, e.g. "wood_30mm" -> "WOOD 30MM"
+WICK_LABELS = MappingProxyType({name: name.replace("_", " ").upper() for name in BASE_WICKS})
 
 
 # =========================
 # Persistence helpers
 # =========================
 
+def _json_loads(raw):
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _json_dumps(data, pretty=True):
+    """
+    JSON as UTF-8 bytes. pretty=True (2-space indent) is for human-curated
+    files; machine-read data should pass pretty=False for compact output.
+    """
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, option=option)
+    if pretty:
+        return json.dumps(data, indent=2).encode("utf-8")
+    return json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+
+@st.cache_data(show_spinner=False)
+def _read_json_file(path, mtime):
+    """
+    Parse a JSON file once per (path, mtime).
+    `mtime` is only part of the cache key, so edits on disk invalidate the entry.
+    st.cache_data hands every caller its own copy, so results are safe to mutate.
+    """
+    with open(path, "rb") as f:
+        return _json_loads(f.read())
+
+
+@st.cache_resource
+def _write_queue():
+    """
+    Process-wide state for coalesced saves. Cached as a resource because
+    Streamlit re-executes this module on every rerun, which would otherwise
+    orphan pending writes and their timers.
+    """
+    queue = {
+        "pending": {},     # path -> {"data": latest unsaved payload, "timer": threading.Timer}
+        "lock": threading.Lock(),
+        "path_locks": {},  # path -> threading.Lock serializing writes to that file
+        "errors": {},      # path -> last background write error, until shown in the UI
+    }
+    atexit.register(_flush_all, queue)
+    return queue
+
+
+def report_save_errors():
+    """
+    Show (once) any background write that failed since the last call.
+    The timer thread can't render, so failures wait here for the next rerun.
+    """
+    queue = _write_queue()
+    with queue["lock"]:
+        errors, queue["errors"] = queue["errors"], {}
+    for path, e in errors.items():
+        st.error(f"Error saving file `{path}`: {e}")
+
+
 def load_json(path, default):
-    if not os.path.exists(path):
+    report_save_errors()
+    # A save that hasn't hit the disk yet is newer than the file
+    queue = _write_queue()
+    with queue["lock"]:
+        pending = queue["pending"].get(path)
+    if pending is not None:
+        return copy.deepcopy(pending["data"])
+
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
         return default
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        return data
+        return _read_json_file(path, mtime)
     except Exception:
         # If file is corrupted, just fall back to default
         return default
 
 
-def save_json(path, data):
+def _write_json(path, data):
+    """
+    Write via a temp file + rename so a crash mid-write can never leave
+    a truncated file behind (load_json would silently replace it with defaults).
+    """
+    tmp_path = path + ".tmp"
     try:
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
+        with open(tmp_path, "wb") as f:
+            f.write(_json_dumps(data))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        _read_json_file.clear()
+
+
+def _flush(queue, path):
+    """
+    Write the pending payload for `path` (if any) to disk.
+    Raises on I/O errors; the payload is dropped either way.
+    """
+    with queue["lock"]:
+        path_lock = queue["path_locks"].setdefault(path, threading.Lock())
+    with path_lock:
+        with queue["lock"]:
+            pending = queue["pending"].pop(path, None)
+        if pending is None:
+            return
+        pending["timer"].cancel()
+        _write_json(path, pending["data"])
+
+
+def _flush_in_background(queue, path):
+    # Runs on the timer thread, where st.error has nowhere to render;
+    # the error is kept for report_save_errors() to show
+    try:
+        _flush(queue, path)
     except Exception as e:
-        st.error(f"Error saving file `{path}`: {e}")
+        logger.exception("Error saving file `%s`", path)
+        with queue["lock"]:
+            queue["errors"][path] = e
+
+
+def _flush_all(queue):
+    with queue["lock"]:
+        paths = list(queue["pending"])
+    for path in paths:
+        _flush_in_background(queue, path)
+
+
+def force_flush_all():
+    """
+    Write every pending save to disk now.
+    Use at critical checkpoints where the data must not wait for the timer.
+    """
+    queue = _write_queue()
+    with queue["lock"]:
+        paths = list(queue["pending"])
+    for path in paths:
+        try:
+            _flush(queue, path)
+        except Exception as e:
+            st.error(f"Error saving file `{path}`: {e}")
+
+
+def save_json(path, data):
+    """
+    Queue `data` to be written to `path` after SAVE_DELAY_SECONDS.
+    Repeated saves within the delay collapse into a single write of the latest data.
+    """
+    report_save_errors()
+    queue = _write_queue()
+    # Snapshot so later in-place edits can't race the background write
+    snapshot = copy.deepcopy(data)
+    timer = threading.Timer(SAVE_DELAY_SECONDS, _flush_in_background, args=(queue, path))
+    timer.daemon = True  # atexit flushes anything still pending
+    with queue["lock"]:
+        previous = queue["pending"].get(path)
+        if previous is not None:
+            previous["timer"].cancel()
+        queue["pending"][path] = {"data": snapshot, "timer": timer}
+        timer.start()
 
 
 def load_scents_from_file():
@@ -88,6 +259,7 @@ def save_scents_to_file(custom_scents):
     Save only custom scents (not the built-in ones) to file.
     """
     save_json(SCENTS_FILE, custom_scents)
+    bump_version("scents")
 
 
 def load_blends_from_file():
@@ -119,6 +291,7 @@ def load_blends_from_file():
 
 def save_blends_to_file(blends):
     save_json(BLENDS_FILE, blends)
+    bump_version("blends")
 
 
 def load_containers_from_file():
@@ -133,7 +306,8 @@ def load_containers_from_file():
           "shape": "Round",
           "supplier": "Supplier Name",
           "cost_per_unit": 2.50,
-          "notes": "Optional notes"
+          "notes": "Optional notes",
+          "display_caption": "7.5oz • Round • $2.50 each"
       },
       ...
     }
@@ -143,11 +317,191 @@ def load_containers_from_file():
 
 def save_containers_to_file(containers):
     save_json(CONTAINERS_FILE, containers)
+    bump_version("containers")
+
+
+# Item fields stored as plain columns; wick_config is stored as JSON text
+INVENTORY_FIELDS = (
+    "sku", "product_name", "container_id", "blend_name", "production_date",
+    "batch_number", "quantity", "material_cost", "container_cost", "target_price",
+    "wax_oz", "fragrance_oz", "water_oz", "notes",
+)
+
+_CREATE_ITEMS_SQL = """
+CREATE TABLE IF NOT EXISTS items (
+    item_id TEXT PRIMARY KEY,
+    sku TEXT,
+    product_name TEXT,
+    container_id TEXT,
+    blend_name TEXT,
+    production_date TEXT,
+    batch_number TEXT,
+    quantity INT,
+    material_cost REAL,
+    container_cost REAL,
+    target_price REAL,
+    wick_config_json TEXT,
+    wax_oz REAL,
+    fragrance_oz REAL,
+    water_oz REAL,
+    notes TEXT
+)
+"""
+
+_SELECT_ITEMS_SQL = (
+    f"SELECT item_id, {', '.join(INVENTORY_FIELDS)}, wick_config_json "
+    "FROM items ORDER BY rowid"
+)
+
+# PRAGMA user_version once the legacy inventory.json has been imported
+_LEGACY_IMPORTED_VERSION = 1
+
+# Upsert rather than INSERT OR REPLACE so an updated item keeps its rowid (display order)
+_UPSERT_ITEM_SQL = (
+    f"INSERT INTO items (item_id, {', '.join(INVENTORY_FIELDS)}, wick_config_json) "
+    f"VALUES ({', '.join('?' * (len(INVENTORY_FIELDS) + 2))}) "
+    "ON CONFLICT(item_id) DO UPDATE SET "
+    + ", ".join(f"{col} = excluded.{col}" for col in INVENTORY_FIELDS + ("wick_config_json",))
+)
+
+
+def get_inventory_db():
+    """
+    Returns this session's SQLite connection to INVENTORY_DB, creating the
+    schema on first use. Streamlit runs each rerun on a new thread, so the
+    connection is opened with check_same_thread=False.
+    """
+    if "inventory_db" not in st.session_state:
+        conn = sqlite3.connect(INVENTORY_DB, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        # In WAL mode NORMAL only fsyncs at checkpoints; commits stay durable across app crashes
+        conn.execute("PRAGMA synchronous=NORMAL")
+        with conn:
+            conn.execute(_CREATE_ITEMS_SQL)
+            conn.execute("CREATE INDEX IF NOT EXISTS items_sku ON items (sku)")
+            conn.execute("CREATE INDEX IF NOT EXISTS items_container ON items (container_id)")
+        st.session_state.inventory_db = conn
+    return st.session_state.inventory_db
+
+
+def _item_to_row(item_id, item):
+    return (
+        item_id,
+        *(item.get(field) for field in INVENTORY_FIELDS),
+        _json_dumps(item.get("wick_config", {}), pretty=False).decode("utf-8"),
+    )
+
+
+def _row_to_item(row):
+    item_id, *values, wick_config_json = row
+    # Skip NULLs so older items without e.g. container_cost keep using .get() defaults
+    item = {field: value for field, value in zip(INVENTORY_FIELDS, values) if value is not None}
+    item["wick_config"] = _json_loads(wick_config_json) if wick_config_json else {}
+    item["_keys"] = item_widget_keys(item_id)
+    return item_id, item
+
+
+def item_widget_keys(item_id):
+    """
+    (quantity, update, delete) widget keys for an item's card. Stamped onto
+    the in-memory item as "_keys" (never written to the db) so reruns reuse
+    them instead of rebuilding the strings.
+    """
+    return (f"qty_{item_id}", f"update_{item_id}", f"delete_{item_id}")
+
+
+class InventoryStore(MutableMapping):
+    """
+    Inventory mapping that writes through to SQLite: assigning or deleting an
+    item touches only that row instead of rewriting the whole inventory.
+    Every mutating method (pop, clear, setdefault, ...) goes through
+    __setitem__/__delitem__, so none of them can skip the db.
+    In-place edits to an item (item["quantity"] = ...) are not persisted
+    (or seen by memoized views); reassign the item or use set_quantities().
+    """
+
+    def __init__(self, conn, items=()):
+        self._items = dict(items)
+        self._conn = conn
+
+    def __getitem__(self, item_id):
+        return self._items[item_id]
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, item_id):
+        return item_id in self._items
+
+    def keys(self):
+        return self._items.keys()
+
+    def values(self):
+        return self._items.values()
+
+    def items(self):
+        return self._items.items()
+
+    def __setitem__(self, item_id, item):
+        item.setdefault("_keys", item_widget_keys(item_id))
+        with self._conn:
+            self._conn.execute(_UPSERT_ITEM_SQL, _item_to_row(item_id, item))
+        self._items[item_id] = item
+        bump_version("inventory")
+
+    def update(self, items=(), **kwargs):
+        """
+        Upsert many items in a single transaction (e.g. a whole production batch).
+        """
+        items = dict(items, **kwargs)
+        for item_id, item in items.items():
+            item.setdefault("_keys", item_widget_keys(item_id))
+        with self._conn:
+            self._conn.executemany(
+                _UPSERT_ITEM_SQL,
+                (_item_to_row(item_id, item) for item_id, item in items.items()),
+            )
+        self._items.update(items)
+        bump_version("inventory")
+
+    def __ior__(self, items):
+        self.update(items)
+        return self
+
+    def set_quantities(self, quantities):
+        """
+        Change only the quantity of each {item_id: quantity}, in one
+        transaction, without rewriting the rest of the row. Ids no longer
+        in the inventory (e.g. deleted from another widget) are skipped.
+        """
+        quantities = {
+            item_id: quantity for item_id, quantity in quantities.items() if item_id in self._items
+        }
+        if not quantities:
+            return
+        with self._conn:
+            self._conn.executemany(
+                "UPDATE items SET quantity = ? WHERE item_id = ?",
+                ((quantity, item_id) for item_id, quantity in quantities.items()),
+            )
+        for item_id, quantity in quantities.items():
+            self._items[item_id] = {**self._items[item_id], "quantity": quantity}
+        bump_version("inventory")
+
+    def __delitem__(self, item_id):
+        del self._items[item_id]
+        with self._conn:
+            self._conn.execute("DELETE FROM items WHERE item_id = ?", (item_id,))
+        bump_version("inventory")
 
 
 def load_inventory_from_file():
     """
-    Returns dict of inventory items.
+    Returns an InventoryStore of inventory items, backed by inventory.db.
+    On first run, items from a legacy inventory.json are imported.
     Structure:
     {
       "item_id": {
@@ -168,11 +522,35 @@ def load_inventory_from_file():
       ...
     }
     """
-    return load_json(INVENTORY_FILE, {})
+    conn = get_inventory_db()
+    # Import inventory.json only once; after that an empty table means the
+    # user deleted everything, not that the db is new
+    if conn.execute("PRAGMA user_version").fetchone()[0] < _LEGACY_IMPORTED_VERSION:
+        if conn.execute("SELECT 1 FROM items LIMIT 1").fetchone() is None:
+            save_inventory_to_file(load_json(INVENTORY_FILE, {}))
+        conn.execute(f"PRAGMA user_version = {_LEGACY_IMPORTED_VERSION}")
+    rows = conn.execute(_SELECT_ITEMS_SQL).fetchall()
+    return InventoryStore(conn, (_row_to_item(row) for row in rows))
 
 
 def save_inventory_to_file(inventory):
-    save_json(INVENTORY_FILE, inventory)
+    """
+    Upsert every item in `inventory` in a single transaction.
+    """
+    conn = get_inventory_db()
+    with conn:
+        conn.executemany(
+            _UPSERT_ITEM_SQL,
+            (_item_to_row(item_id, item) for item_id, item in inventory.items()),
+        )
+
+
+def compact_inventory():
+    """
+    Each write is appended to SQLite's write-ahead log (inventory.db-wal);
+    this folds the log back into inventory.db and truncates it.
+    """
+    get_inventory_db().execute("PRAGMA wal_checkpoint(TRUNCATE)")
 
 
 # =========================
@@ -183,7 +561,7 @@ def init_session_state():
     # Load scents: base + persisted customs
     if "scents" not in st.session_state:
         custom_scents = load_scents_from_file()
-        scents = copy.deepcopy(BASE_SCENTS)
+        scents = dict(BASE_SCENTS)
         scents.update(custom_scents)  # custom overrides if same key
         st.session_state.scents = scents
 
@@ -192,11 +570,11 @@ def init_session_state():
         # Anything not in BASE_SCENTS is considered custom
         st.session_state.custom_scents = {
             k: v for k, v in st.session_state.scents.items()
-            if k not in BASE_SCENTS
+            if k not in _BASE_SCENT_KEYS
         }
 
     if "wicks" not in st.session_state:
-        st.session_state.wicks = copy.deepcopy(BASE_WICKS)
+        st.session_state.wicks = dict(BASE_WICKS)
 
     # Load saved blends
     if "blends" not in st.session_state:
@@ -211,6 +589,87 @@ def init_session_state():
         st.session_state.inventory = load_inventory_from_file()
 
 
+def bump_version(source):
+    """
+    Mark session data `source` (e.g. "containers") as changed so views
+    memoized from it are rebuilt on the next rerun.
+    """
+    key = f"{source}_version"
+    st.session_state[key] = st.session_state.get(key, 0) + 1
+
+
+def memoized_view(view, sources, build):
+    """
+    Returns build(), memoized in st.session_state until bump_version() is
+    called for `sources` (one name or a tuple of names).
+    Streamlit reruns the whole script on every widget interaction; this keeps
+    derived lists from being rebuilt each time. Per-session on purpose:
+    st.cache_data is shared across sessions, but this data isn't.
+    """
+    if isinstance(sources, str):
+        sources = (sources,)
+    version = tuple(st.session_state.get(f"{source}_version", 0) for source in sources)
+    memo_key = f"_view_{view}"
+    memo = st.session_state.get(memo_key)
+    if memo is None or memo[0] != version:
+        memo = (version, build())
+        st.session_state[memo_key] = memo
+    return memo[1]
+
+
+def blend_names():
+    return memoized_view("blend_names", "blends", lambda: list(st.session_state.blends))
+
+
+def container_options():
+    """
+    Returns (container_ids, container_names), aligned by index.
+    """
+    def build():
+        container_items = list(st.session_state.containers.items())
+        return (
+            [cid for cid, _ in container_items],
+            [info["name"] for _, info in container_items],
+        )
+
+    return memoized_view("container_options", "containers", build)
+
+
+def container_name_by_id():
+    """
+    Returns { container_id: name }. Look up with .get(container_id, "Unknown")
+    since items can outlive a deleted container.
+    """
+    return memoized_view(
+        "container_name_by_id",
+        "containers",
+        lambda: {cid: info["name"] for cid, info in st.session_state.containers.items()},
+    )
+
+
+def sidebar_lists():
+    """
+    Returns the sidebar's (scents, saved blends) lists, each pre-rendered as
+    one markdown block with a line per scent (cost per oz) / blend (recipe).
+    """
+    def build():
+        scents = st.session_state.scents
+        blends = st.session_state.blends
+        # "\$": a pair of bare $ across lines would render as inline math
+        scent_lines = [f"• {pretty_name(key)} — \\${cost:.2f}/oz" for key, cost in scents.items()]
+        blend_lines = []
+        for name, info in blends.items():
+            parts = ", ".join(
+                f"{pct:.0f}% {pretty_name(sk)}"
+                for sk, pct in info["scents"].items()
+            )
+            blend_lines.append(f"• {name}: {parts}")
+        # "  \n" is a markdown line break
+        return "  \n".join(scent_lines), "  \n".join(blend_lines)
+
+    return memoized_view("sidebar_lists", ("scents", "blends"), build)
+
+
 # =========================
 # Helper functions
 # =========================
@@ -239,10 +698,27 @@ def add_custom_scent():
                 st.success(f"Added scent `{key}` at ${cost_per_oz:.2f}/oz (saved to scents.json).")
 
 
+@lru_cache(maxsize=512)
 def pretty_name(key: str) -> str:
     return key.replace("_", " ").title()
 
 
+def container_caption(info):
+    return f"{info['capacity_water_oz']:.1f}oz • {info['shape']} • ${info['cost_per_unit']:.2f} each"
+
+
+def delete_container(container_id):
+    """
+    Delete button callback. Callbacks run before the script reruns, so the
+    rerun Streamlit does for the click already shows the container gone.
+    """
+    info = st.session_state.containers.pop(container_id, None)
+    if info is None:
+        return
+    save_containers_to_file(st.session_state.containers)
+    st.toast(f"Deleted container '{info['name']}'")
+
+
 def manage_containers():
     """
     UI for managing container types (bottles, jars, etc.)
@@ -269,7 +745,7 @@ def manage_containers():
                 st.warning("Water capacity must be greater than 0.")
             else:
                 container_id = container_name.strip().lower().replace(" ", "_")
-                st.session_state.containers[container_id] = {
+                container = {
                     "name": container_name.strip(),
                     "capacity_water_oz": capacity_water_oz,
                     "shape": shape,
@@ -277,9 +753,12 @@ def manage_containers():
                     "cost_per_unit": cost_per_unit,
                     "notes": notes.strip() if notes else ""
                 }
+                # Formatted once here instead of on every rerun
+                container["display_caption"] = container_caption(container)
+                st.session_state.containers[container_id] = container
                 save_containers_to_file(st.session_state.containers)
+                # The list below renders after this, so it already includes the new container
                 st.success(f"Added container '{container_name}' (saved to containers.json).")
-                st.rerun()
 
         # Display existing containers
         if st.session_state.containers:
@@ -289,18 +768,19 @@ def manage_containers():
                     col_a, col_b, col_c = st.columns([3, 1, 1])
                     with col_a:
                         st.write(f"**{info['name']}**")
-                        st.caption(f"{info['capacity_water_oz']:.1f}oz • {info['shape']} • ${info['cost_per_unit']:.2f} each")
+                        st.caption(info.get("display_caption") or container_caption(info))
                         if info.get('supplier'):
                             st.caption(f"Supplier: {info['supplier']}")
                     with col_b:
                         if st.button("Edit", key=f"edit_container_{container_id}"):
                             st.info("Edit feature coming soon!")
                     with col_c:
-                        if st.button("Delete", key=f"del_container_{container_id}"):
-                            del st.session_state.containers[container_id]
-                            save_containers_to_file(st.session_state.containers)
-                            st.success(f"Deleted container '{info['name']}'")
-                            st.rerun()
+                        st.button(
+                            "Delete",
+                            key=f"del_container_{container_id}",
+                            on_click=delete_container,
+                            args=(container_id,),
+                        )
                     st.divider()
         else:
             st.info("No containers added yet. Add your first container above!")
@@ -310,23 +790,83 @@ def compute_blend_cost_from_definition(scents_dict, blend_def):
     """
     blend_def: {"scents": { "scent_key": pct, ... }}
     Returns (weighted_cost_per_oz, total_pct, warnings)
+    warnings is a list, or an empty tuple in the usual no-warning case.
     """
     blend_scents = blend_def.get("scents", {})
     total_pct = sum(blend_scents.values())
-    warnings = []
+    warnings = None
 
     if abs(total_pct - 100.0) > 0.01:
-        warnings.append(f"Blend percents total {total_pct:.1f}%, not 100%.")
-    # Weighted FO cost per oz
-    weighted_cost = 0.0
-    for scent_key, pct in blend_scents.items():
-        if scent_key not in scents_dict:
+        warnings = [f"Blend percents total {total_pct:.1f}%, not 100%."]
+    known_keys = []
+    for scent_key in blend_scents:
+        if scent_key in scents_dict:
+            known_keys.append(scent_key)
+        else:
+            if warnings is None:
+                warnings = []
             warnings.append(f"Scent `{scent_key}` is not in current scent list.")
-            continue
-        weight = pct / 100.0
-        weighted_cost += weight * scents_dict[scent_key]
 
-    return weighted_cost, total_pct, warnings
+    weighted_cost = weighted_scent_cost(
+        [blend_scents[k] for k in known_keys], [scents_dict[k] for k in known_keys]
+    )
+    return weighted_cost, total_pct, warnings or ()
+
+
+@st.cache_data(show_spinner=False)
+def _cached_blend_cost(blend_items, prices):
+    known_prices = {
+        scent_key: price
+        for (scent_key, _), price in zip(blend_items, prices)
+        if price is not None
+    }
+    cost, total_pct, warnings = compute_blend_cost_from_definition(
+        known_prices, {"scents": dict(blend_items)}
+    )
+    return cost, total_pct, tuple(warnings)
+
+
+def blend_cost(scents_dict, blend_def):
+    """
+    compute_blend_cost_from_definition, memoized on the blend's (scent, pct)
+    pairs plus the current price of just those scents, so unrelated price
+    changes don't invalidate it. Warnings come back as a tuple.
+    """
+    blend_items = tuple(blend_def.get("scents", {}).items())
+    prices = tuple(scents_dict.get(scent_key) for scent_key, _ in blend_items)
+    return _cached_blend_cost(blend_items, prices)
+
+
+def weighted_scent_cost(pcts, costs_per_oz):
+    """
+    Weighted FO cost per oz: dot product of percentages (0-100) and aligned per-oz costs.
+    """
+    pct_array = np.fromiter(pcts, dtype=np.float64, count=len(pcts))
+    cost_array = np.fromiter(costs_per_oz, dtype=np.float64, count=len(costs_per_oz))
+    return float(pct_array @ cost_array) / 100.0
+
+
+def batch_blend_costs(blends_dict, scents_dict):
+    """
+    Weighted FO cost per oz for every blend in one (n_blends x n_scents) @ (n_scents,) product.
+    Returns { blend_name: cost_per_oz, ... }; the cost is None for a blend
+    that uses a scent missing from scents_dict (it can't be priced).
+    """
+    column = {scent_key: j for j, scent_key in enumerate(scents_dict)}
+    recipe = np.zeros((len(blends_dict), len(column)))
+    unpriced = set()
+    for i, (name, info) in enumerate(blends_dict.items()):
+        for scent_key, pct in info["scents"].items():
+            j = column.get(scent_key)
+            if j is None:
+                unpriced.add(name)
+            else:
+                recipe[i, j] = pct
+    costs = np.fromiter(scents_dict.values(), dtype=np.float64, count=len(column))
+    return {
+        name: None if name in unpriced else cost
+        for name, cost in zip(blends_dict, (recipe @ costs / 100.0).tolist())
+    }
 
 
 def build_new_blend(scents_dict):
@@ -337,7 +877,7 @@ def build_new_blend(scents_dict):
     """
     st.write("Create your fragrance blend with weighted percentages (must total 100%).")
 
-    scent_keys = list(scents_dict.keys())
+    scent_keys = list(scents_dict)
 
     num_rows = st.slider("How many scents in this blend?", min_value=1, max_value=4, value=1, key="new_blend_num_rows")
     rows = []
@@ -365,8 +905,13 @@ def build_new_blend(scents_dict):
     # Build dict
     blend_scents = {}
     for scent_key, pct in rows:
-        if pct > 0:
-            blend_scents[scent_key] = blend_scents.get(scent_key, 0.0) + pct
+        if pct <= 0:
+            continue
+        # Same scent picked in two rows: combine the percentages
+        if scent_key in blend_scents:
+            blend_scents[scent_key] += pct
+        else:
+            blend_scents[scent_key] = pct
 
     total_pct = sum(blend_scents.values())
     if not blend_scents:
@@ -377,11 +922,9 @@ def build_new_blend(scents_dict):
         st.error(f"Blend percentages must total 100%. Current total: {total_pct:.1f}%.")
         return None, total_pct, blend_scents
 
-    # Weighted FO cost per oz
-    weighted_cost = 0.0
-    for scent_key, pct in blend_scents.items():
-        weight = pct / 100.0
-        weighted_cost += weight * scents_dict[scent_key]
+    weighted_cost = weighted_scent_cost(
+        list(blend_scents.values()), [scents_dict[k] for k in blend_scents]
+    )
 
     st.success(f"Blend OK ✅ (Total: {total_pct:.1f}%) • Weighted FO cost: ${weighted_cost:.2f}/oz")
     return weighted_cost, total_pct, blend_scents
@@ -400,6 +943,7 @@ def blend_selector(scents_dict):
         "How do you want to choose the fragrance blend?",
         options=["Use saved blend", "Create new blend"],
         horizontal=True,
+        key="blend_mode",
     )
 
     # --- Use saved blend ---
@@ -408,11 +952,10 @@ def blend_selector(scents_dict):
             st.info("No saved blends yet. Switch to 'Create new blend' to define one.")
             return None, "no_blend"
 
-        blend_names = list(st.session_state.blends.keys())
-        selected = st.selectbox("Saved blends", options=blend_names, key="selected_saved_blend")
+        selected = st.selectbox("Saved blends", options=blend_names(), key="selected_saved_blend")
         blend_def = st.session_state.blends[selected]
 
-        cost, total_pct, warnings = compute_blend_cost_from_definition(scents_dict, blend_def)
+        cost, total_pct, warnings = blend_cost(scents_dict, blend_def)
 
         st.write(f"**Blend:** {selected}")
         lines = []
@@ -470,7 +1013,7 @@ def choose_wicks(wicks_dict):
     for (name, cost), col in zip(wicks_dict.items(), cols):
         with col:
             count = st.number_input(
-                name.replace("_", " ").upper(),
+                WICK_LABELS[name],
                 min_value=0,
                 max_value=10,
                 step=1,
@@ -487,6 +1030,32 @@ def choose_wicks(wicks_dict):
     return total_wick_cost, wick_counts
 
 
+@st.cache_data(show_spinner=False)
+def _format_wick_lines(wick_counts_items, wicks_items):
+    """
+    Markdown list of the wicks in use ("- 2 × WOOD 30MM @ $1.47 = $2.94"),
+    one line per wick type with a non-zero count. Dollar signs are escaped;
+    a bare pair would render as inline math.
+    """
+    wicks = dict(wicks_items)
+    return "\n".join(
+        f"- {count} × {WICK_LABELS[name]} @ \\${wicks[name]:.2f} = \\${wicks[name] * count:.2f}"
+        for name, count in wick_counts_items
+        if count > 0
+    )
+
+
+class CostResults(NamedTuple):
+    wax_oz: float
+    fragrance_oz: float
+    wax_cost: float
+    fragrance_cost: float
+    wick_cost: float
+    total_material_cost: float
+    cost_per_wax_oz: float
+
+
+@st.cache_data(show_spinner=False, max_entries=256)
 def compute_results(
     water_oz,
     wax_cost_per_oz,
@@ -495,6 +1064,13 @@ def compute_results(
     fo_cost_per_oz,
     wick_cost
 ):
+    """
+    Cached CostResults for one set of inputs. A tuple return keeps the
+    cache's copy-on-read cheap compared to a dict.
+
+    Any argument may be a NumPy array (e.g. a sweep over jar sizes); the
+    fields of the result then broadcast to arrays too.
+    """
     wax_oz = water_oz * water_to_wax_ratio
     fragrance_oz = wax_oz * fragrance_load
 
@@ -502,23 +1078,29 @@ def compute_results(
     fragrance_cost = fragrance_oz * fo_cost_per_oz
 
     total_material_cost = wax_cost + fragrance_cost + wick_cost
-    cost_per_wax_oz = total_material_cost / wax_oz if wax_oz > 0 else 0.0
-
-    return {
-        "wax_oz": wax_oz,
-        "fragrance_oz": fragrance_oz,
-        "wax_cost": wax_cost,
-        "fragrance_cost": fragrance_cost,
-        "wick_cost": wick_cost,
-        "total_material_cost": total_material_cost,
-        "cost_per_wax_oz": cost_per_wax_oz,
-    }
+    if np.ndim(wax_oz):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cost_per_wax_oz = np.where(wax_oz > 0, total_material_cost / wax_oz, 0.0)
+    else:
+        cost_per_wax_oz = total_material_cost / wax_oz if wax_oz > 0 else 0.0
+
+    return CostResults(
+        wax_oz=wax_oz,
+        fragrance_oz=fragrance_oz,
+        wax_cost=wax_cost,
+        fragrance_cost=fragrance_cost,
+        wick_cost=wick_cost,
+        total_material_cost=total_material_cost,
+        cost_per_wax_oz=cost_per_wax_oz,
+    )
 
 
 def add_to_inventory_form(results, blend_source, wick_counts, water_oz):
     """
     Form to add calculated candle to inventory
     """
+    from datetime import date  # only needed here
+
     st.markdown("---")
     st.subheader("📦 Add to Inventory")
 
@@ -534,8 +1116,7 @@ def add_to_inventory_form(results, blend_source, wick_counts, water_oz):
             product_name = st.text_input("Product Name", placeholder="Boot Leather - 8oz", key="inv_product_name")
 
             # Container selection
-            container_ids = list(st.session_state.containers.keys())
-            container_names = [st.session_state.containers[cid]["name"] for cid in container_ids]
+            container_ids, container_names = container_options()
             selected_container_idx = st.selectbox(
                 "Container Type",
                 options=range(len(container_ids)),
@@ -543,6 +1124,8 @@ def add_to_inventory_form(results, blend_source, wick_counts, water_oz):
                 key="inv_container"
             )
             selected_container_id = container_ids[selected_container_idx]
+            container_info = st.session_state.containers[selected_container_id]
+            container_cost = container_info["cost_per_unit"]
 
             quantity = st.number_input("Initial Quantity", min_value=0, value=1, step=1, key="inv_quantity")
 
@@ -556,7 +1139,7 @@ def add_to_inventory_form(results, blend_source, wick_counts, water_oz):
 
             st.text_input("Blend Name", value=blend_name, key="inv_blend", disabled=True)
 
-            production_date = st.date_input("Production Date", value=datetime.today(), key="inv_prod_date")
+            production_date = st.date_input("Production Date", value=date.today(), key="inv_prod_date")
             batch_number = st.text_input("Batch Number", placeholder="B001", key="inv_batch")
             target_price = st.number_input("Target/Retail Price ($)", min_value=0.0, value=0.0, step=1.0, key="inv_target_price")
 
@@ -564,14 +1147,13 @@ def add_to_inventory_form(results, blend_source, wick_counts, water_oz):
 
         # Show profit margin if target price is set
         if target_price > 0:
-            container_cost = st.session_state.containers[selected_container_id]["cost_per_unit"]
-            total_unit_cost = results["total_material_cost"] + container_cost
+            total_unit_cost = results.total_material_cost + container_cost
             profit = target_price - total_unit_cost
             margin = (profit / target_price * 100) if target_price > 0 else 0
 
             col_a, col_b, col_c = st.columns(3)
             with col_a:
-                st.metric("Material Cost", f"${results['total_material_cost']:.2f}")
+                st.metric("Material Cost", f"${results.total_material_cost:.2f}")
             with col_b:
                 st.metric("+ Container Cost", f"${container_cost:.2f}")
             with col_c:
@@ -585,9 +1167,8 @@ def add_to_inventory_form(results, blend_source, wick_counts, water_oz):
             elif not product_name.strip():
                 st.warning("Please enter a Product Name.")
             else:
-                # Generate unique inventory ID
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                item_id = f"{sku.strip().lower().replace(' ', '_')}_{timestamp}"
+                # Generate unique inventory ID (ns resolution, so two saves in one second can't collide)
+                item_id = f"{sku.strip().lower().replace(' ', '_')}_{time.time_ns()}"
 
                 # Create inventory item
                 inventory_item = {
@@ -598,121 +1179,264 @@ def add_to_inventory_form(results, blend_source, wick_counts, water_oz):
                     "production_date": production_date.strftime("%Y-%m-%d"),
                     "batch_number": batch_number.strip(),
                     "quantity": quantity,
-                    "material_cost": results["total_material_cost"],
-                    "container_cost": st.session_state.containers[selected_container_id]["cost_per_unit"],
+                    "material_cost": results.total_material_cost,
+                    "container_cost": container_cost,
                     "target_price": target_price,
                     "wick_config": wick_counts,
-                    "wax_oz": results["wax_oz"],
-                    "fragrance_oz": results["fragrance_oz"],
+                    "wax_oz": results.wax_oz,
+                    "fragrance_oz": results.fragrance_oz,
                     "water_oz": water_oz,
                     "notes": notes.strip() if notes else ""
                 }
 
+                # The item is committed to inventory.db right away, but the
+                # container it points at may have just been added and still be
+                # a queued containers.json save. Flush first so the stored row
+                # never references a container that isn't on disk.
+                force_flush_all()
                 st.session_state.inventory[item_id] = inventory_item
-                save_inventory_to_file(st.session_state.inventory)
-                st.success(f"✅ Added '{product_name}' to inventory! (saved to inventory.json)")
+                st.success(f"✅ Added '{product_name}' to inventory! (saved to inventory.db)")
                 st.balloons()
 
 
-# =========================
-# Streamlit App
-# =========================
+INVENTORY_COLUMN_CONFIG = {
+    "product_name": st.column_config.TextColumn("Product"),
+    "sku": st.column_config.TextColumn("SKU"),
+    "blend_name": st.column_config.TextColumn("Blend"),
+    "container_name": st.column_config.TextColumn("Container"),
+    "quantity": st.column_config.NumberColumn("Qty", min_value=0, step=1),
+    "unit_cost": st.column_config.NumberColumn("Unit cost", format="$%.2f"),
+    "target_price": st.column_config.NumberColumn("Target price", format="$%.2f"),
+    "margin_pct": st.column_config.NumberColumn("Margin", format="%.1f%%"),
+}
 
-def main():
-    st.set_page_config(
-        page_title="Desert Candle Works Cost Calculator",
-        page_icon="🕯️",
-        layout="centered",
-    )
 
-    # Light custom styling
-    st.markdown(
-        """
-        <style>
-        .main {
-            background: radial-gradient(circle at top left, #f7f0ff 0, #fefcf8 40%, #f9f5ff 100%);
-        }
-        .stApp {
-            font-family: system-ui, -apple-system, BlinkMacSystemFont, "Segoe UI", sans-serif;
-        }
-        .dcw-card {
-            padding: 1.2rem 1.4rem;
-            border-radius: 1.2rem;
-            background-color: rgba(255,255,255,0.9);
-            box-shadow: 0 12px 30px rgba(15, 23, 42, 0.06);
-            border: 1px solid rgba(148, 163, 184, 0.25);
-        }
-        </style>
-        """,
-        unsafe_allow_html=True,
-    )
+def inventory_frame():
+    """
+    Returns the inventory as a DataFrame indexed by item_id, one row per item
+    with the columns in INVENTORY_COLUMN_CONFIG plus search_blob (lowercased
+    product name and SKU joined by a NUL, so a query can't match across the
+    two). margin_pct is NaN when no target price is set.
+    """
+    def build():
+        container_names = container_name_by_id()
+        rows = []
+        for item in st.session_state.inventory.values():
+            unit_cost = item["material_cost"] + item.get("container_cost", 0)
+            target_price = item.get("target_price", 0)
+            rows.append((
+                item["product_name"],
+                item["sku"],
+                item["blend_name"],
+                container_names.get(item["container_id"], "Unknown"),
+                item["quantity"],
+                unit_cost,
+                target_price,
+                (target_price - unit_cost) / target_price * 100 if target_price > 0 else np.nan,
+                f"{item['product_name'].lower()}\0{item['sku'].lower()}",
+            ))
+        return pd.DataFrame(
+            rows,
+            index=pd.Index(list(st.session_state.inventory), name="item_id"),
+            columns=[*INVENTORY_COLUMN_CONFIG, "search_blob"],
+        )
 
-    init_session_state()
+    return memoized_view("inventory_frame", ("inventory", "containers"), build)
 
-    st.title("🕯️ Desert Candle Works – Inventory Management")
-    st.caption("Calculate costs and manage your candle inventory.")
 
-    # Navigation tabs
-    tab1, tab2 = st.tabs(["📊 Cost Calculator", "📦 Inventory"])
+def inventory_totals():
+    """
+    Returns (total_items, total_quantity, total_value), as column-wise sums over inventory_frame().
+    """
+    def build():
+        frame = inventory_frame()
+        quantity = frame["quantity"]
+        return len(frame), int(quantity.sum()), float((quantity * frame["unit_cost"]).sum())
 
-    # Store current tab in session state
-    if "current_tab" not in st.session_state:
-        st.session_state.current_tab = "calculator"
+    return memoized_view("inventory_totals", "inventory", build)
 
-    # Sidebar – global settings
-    with st.sidebar:
-        st.header("⚙️ Settings")
-        st.write("Adjust global assumptions if needed.")
 
-        wax_cost_per_oz = st.number_input(
-            "Wax cost per oz ($)",
-            min_value=0.0,
-            value=float(DEFAULT_WAX_COST_PER_OZ),
-            step=0.01,
-        )
-        water_to_wax_ratio = st.number_input(
-            "Water → Wax ratio",
-            min_value=0.5,
-            max_value=1.2,
-            value=float(DEFAULT_WATER_TO_WAX_RATIO),
-            step=0.01,
-            help="How many oz of wax fit per oz of water in your jars (default ~0.90).",
-        )
-        fragrance_load = st.slider(
-            "Fragrance load (%)",
-            min_value=4,
-            max_value=12,
-            value=int(DEFAULT_FRAGRANCE_LOAD * 100),
-            step=1,
-            help="Percentage of FO by weight (8% is your current standard).",
-        ) / 100.0
+def save_quantity_edits(editor_key, item_ids):
+    """
+    Inventory table on_change callback: persist edited quantities before the rerun.
+    item_ids maps the table's row positions back to inventory ids.
+    """
+    inventory = st.session_state.inventory
+    quantities = {}
+    for row, changes in st.session_state[editor_key]["edited_rows"].items():
+        quantity = changes.get("quantity")
+        item_id = item_ids[int(row)]
+        # The table can still show a row deleted since it was drawn
+        if quantity is None or item_id not in inventory:
+            continue
+        quantities[item_id] = int(quantity)
+    # Several rows edited before the rerun are saved in one transaction
+    if quantities:
+        inventory.set_quantities(quantities)
 
-        st.divider()
-        st.subheader("Scents in system")
-        for key, cost in st.session_state.scents.items():
-            st.caption(f"• {pretty_name(key)} — ${cost:.2f}/oz")
 
-        if st.session_state.blends:
-            st.divider()
-            st.subheader("Saved blends")
-            for name, info in st.session_state.blends.items():
-                parts = ", ".join(
-                    f"{pct:.0f}% {pretty_name(sk)}"
-                    for sk, pct in info["scents"].items()
-                )
-                st.caption(f"• {name}: {parts}")
+def update_item_quantity(item_id, qty_key):
+    """
+    Update button callback: save the quantity typed into the card.
+    """
+    quantity = st.session_state[qty_key]
+    st.session_state.inventory.set_quantities({item_id: quantity})
+    st.session_state._card_notice = f"Updated quantity to {quantity}"
+
+
+def show_card_notice():
+    """
+    Toast the message left by an item card callback, if any. Callbacks can't
+    display elements during a fragment rerun, so they leave it in session state.
+    """
+    notice = st.session_state.pop("_card_notice", None)
+    if notice:
+        st.toast(notice)
+
+
+def delete_inventory_item(item_id):
+    """
+    Delete button callback.
+    """
+    if st.session_state.inventory.pop(item_id, None) is not None:
+        st.session_state._card_notice = "Item deleted"
 
-    # TAB 1: Cost Calculator
-    with tab1:
-        # Container management
-        manage_containers()
 
-        # Main content card
-        with st.container():
-            st.markdown('<div class="dcw-card">', unsafe_allow_html=True)
+@st.fragment
+def inventory_item_card(item_id):
+    """
+    Detail panel and actions for one inventory item. Runs as a fragment, so
+    Update reruns only this card (the table and totals above catch up on the
+    next full rerun). Delete reruns the whole app so the table and the item
+    picker stop offering the deleted item.
+    """
+    # A fragment rerun reuses the original arguments, so look the item up fresh
+    item = st.session_state.inventory.get(item_id)
+    if item is None:
+        st.rerun(scope="app")
 
-            # 1) Jar & recipe setup
-            st.subheader("1️⃣ Jar & Recipe")
+    show_card_notice()
+
+    with st.container(border=True):
+        st.markdown(f"**{item['product_name']}** (SKU: {item['sku']})")
+        col_a, col_b = st.columns(2)
+
+        with col_a:
+            st.write("**Product Details**")
+            st.write(f"- Blend: {item['blend_name']}")
+            container_name = container_name_by_id().get(item['container_id'], 'Unknown')
+            st.write(f"- Container: {container_name}")
+            st.write(f"- Production Date: {item['production_date']}")
+            if item.get('batch_number'):
+                st.write(f"- Batch: {item['batch_number']}")
+
+            st.write("\n**Recipe**")
+            st.write(f"- Wax: {item['wax_oz']:.2f} oz")
+            st.write(f"- Fragrance: {item['fragrance_oz']:.2f} oz")
+
+        with col_b:
+            st.write("**Inventory**")
+            st.write(f"- Quantity on hand: **{item['quantity']}**")
+
+            st.write("\n**Financials**")
+            material_cost = item['material_cost']
+            container_cost = item.get('container_cost', 0)
+            total_cost = material_cost + container_cost
+            st.write(f"- Material cost: ${material_cost:.2f}")
+            st.write(f"- Container cost: ${container_cost:.2f}")
+            st.write(f"- Total unit cost: **${total_cost:.2f}**")
+
+            target_price = item.get('target_price', 0)
+            if target_price > 0:
+                profit = target_price - total_cost
+                margin = profit * 100.0 / target_price
+                st.write(f"- Target price: ${target_price:.2f}")
+                st.write(f"- Profit per unit: **${profit:.2f}** ({margin:.1f}%)")
+
+        if item.get('notes'):
+            st.write(f"\n**Notes:** {item['notes']}")
+
+        # Action buttons
+        st.markdown("---")
+        col_x, col_y, col_z = st.columns(3)
+
+        qty_key, update_key, delete_key = item["_keys"]
+
+        with col_x:
+            # Adjust quantity
+            st.number_input(
+                "Update quantity",
+                min_value=0,
+                value=item['quantity'],
+                key=qty_key
+            )
+            st.button(
+                "Update",
+                key=update_key,
+                on_click=update_item_quantity,
+                args=(item_id, qty_key),
+            )
+
+        with col_z:
+            st.button(
+                "🗑️ Delete",
+                key=delete_key,
+                on_click=delete_inventory_item,
+                args=(item_id,),
+            )
+
+
+# =========================
+# Streamlit App
+# =========================
+
+VIEWS = {
+    "calculator": "📊 Cost Calculator",
+    "inventory": "📦 Inventory",
+}
+
+# Widget keys (or key prefixes) whose values should survive while their view is hidden
+CALCULATOR_WIDGET_KEYS = (
+    "water_oz", "blend_mode", "selected_saved_blend", "new_blend_", "wick_count_",
+    "new_scent_", "new_container_", "inv_sku", "inv_product_name", "inv_container",
+    "inv_quantity", "inv_prod_date", "inv_batch", "inv_target_price", "inv_notes",
+)
+INVENTORY_WIDGET_KEYS = ("inv_search", "inv_detail_item")
+
+_CSS = """
+<style>
+.main {
+    background: radial-gradient(circle at top left, #f7f0ff 0, #fefcf8 40%, #f9f5ff 100%);
+}
+.stApp {
+    font-family: system-ui, -apple-system, BlinkMacSystemFont, "Segoe UI", sans-serif;
+}
+</style>
+"""
+
+
+def keep_widget_state(key_prefixes):
+    """
+    Streamlit drops a widget's value on any run where the widget isn't
+    rendered. Re-saving it through the Session State API keeps the inputs of
+    the hidden view intact until the user switches back.
+    """
+    for key in list(st.session_state):
+        if isinstance(key, str) and key.startswith(key_prefixes):
+            st.session_state[key] = st.session_state[key]
+
+
+def render_calculator(wax_cost_per_oz, water_to_wax_ratio, fragrance_load):
+    """
+    Cost Calculator view: containers, jar & recipe, blend, wicks, results.
+    """
+    # Container management
+    manage_containers()
+
+    # Main content card
+    with st.container(border=True):
+        # 1) Jar & recipe setup
+        st.subheader("1️⃣ Jar & Recipe")
 
         col_a, col_b = st.columns(2)
         with col_a:
@@ -720,6 +1444,7 @@ def main():
                 "Jar capacity at pour level (oz of WATER)",
                 min_value=0.0,
                 step=0.1,
+                key="water_oz",
                 help="Fill jar with water to your typical pour level, then weigh/measure in oz.",
             )
         with col_b:
@@ -748,9 +1473,9 @@ def main():
                 wick_cost=wick_cost,
             )
 
-            wax_oz = results["wax_oz"]
-            fragrance_oz = results["fragrance_oz"]
-            total_cost = results["total_material_cost"]
+            wax_oz = results.wax_oz
+            fragrance_oz = results.fragrance_oz
+            total_cost = results.total_material_cost
 
             c1, c2, c3 = st.columns(3)
             with c1:
@@ -766,129 +1491,168 @@ def main():
             with col_x:
                 st.write("**Wax**")
                 st.write(f"- Cost per oz: `${wax_cost_per_oz:.3f}`")
-                st.write(f"- Total: `${results['wax_cost']:.2f}`")
+                st.write(f"- Total: `${results.wax_cost:.2f}`")
 
                 st.write("**Fragrance**")
                 st.write(f"- FO cost per oz (blend): `${fo_cost_per_oz:.2f}`")
-                st.write(f"- Total: `${results['fragrance_cost']:.2f}`")
+                st.write(f"- Total: `${results.fragrance_cost:.2f}`")
 
             with col_y:
                 st.write("**Wicks**")
                 if wick_cost > 0:
-                    for name, count in wick_counts.items():
-                        if count > 0:
-                            each = st.session_state.wicks[name]
-                            st.write(
-                                f"- {count} × {name.replace('_',' ').upper()} @ ${each:.2f} = ${each*count:.2f}"
-                            )
+                    st.markdown(
+                        _format_wick_lines(
+                            tuple(wick_counts.items()), tuple(st.session_state.wicks.items())
+                        )
+                    )
                 else:
                     st.write("- No wicks selected")
 
                 st.write("**Totals**")
-                st.write(f"- Total material cost: `${results['total_material_cost']:.2f}`")
-                st.write(f"- Cost per wax oz: `${results['cost_per_wax_oz']:.3f}`")
+                st.write(f"- Total material cost: `${results.total_material_cost:.2f}`")
+                st.write(f"- Cost per wax oz: `${results.cost_per_wax_oz:.3f}`")
 
             # Add to inventory form
             add_to_inventory_form(results, blend_source, wick_counts, water_oz)
 
-            st.markdown("</div>", unsafe_allow_html=True)
 
-    # TAB 2: Inventory
-    with tab2:
-        st.subheader("📦 Inventory Management")
+def render_inventory():
+    """
+    Inventory view: summary metrics, searchable table and item details.
+    """
+    st.subheader("📦 Inventory Management")
+    show_card_notice()  # e.g. "Item deleted", after the card's full-app rerun
+
+    if not st.session_state.inventory:
+        st.info("📦 No items in inventory yet. Use the Cost Calculator tab to add your first candle!")
+    else:
+        # Summary metrics
+        total_items, total_quantity, total_value = inventory_totals()
+
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Total Products", total_items)
+        with col2:
+            st.metric("Total Units", total_quantity)
+        with col3:
+            st.metric("Inventory Value", f"${total_value:.2f}")
+
+        st.markdown("---")
+
+        # Search and filter
+        search = st.text_input("🔍 Search by product name or SKU", key="inv_search")
 
-        if not st.session_state.inventory:
-            st.info("📦 No items in inventory yet. Use the Cost Calculator tab to add your first candle!")
+        query = search.lower()
+        frame = inventory_frame()
+        if query:
+            frame = frame[frame["search_blob"].str.contains(query, regex=False)]
+
+        if frame.empty:
+            st.info("No items match your search.")
         else:
-            # Summary metrics
-            total_items = len(st.session_state.inventory)
-            total_quantity = sum(item["quantity"] for item in st.session_state.inventory.values())
-            total_value = sum(
-                item["quantity"] * (item["material_cost"] + item.get("container_cost", 0))
-                for item in st.session_state.inventory.values()
+            # One table component instead of an expander + ~20 widgets per item
+            item_ids = list(frame.index)
+            editor_key = f"inventory_editor_{st.session_state.get('inventory_version', 0)}"
+            # search_blob is only for filtering; don't ship it to the browser
+            st.data_editor(
+                frame.drop(columns="search_blob"),
+                column_config=INVENTORY_COLUMN_CONFIG,
+                column_order=list(INVENTORY_COLUMN_CONFIG),
+                disabled=[col for col in INVENTORY_COLUMN_CONFIG if col != "quantity"],
+                hide_index=True,
+                key=editor_key,
+                on_change=save_quantity_edits,
+                args=(editor_key, item_ids),
             )
 
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                st.metric("Total Products", total_items)
-            with col2:
-                st.metric("Total Units", total_quantity)
-            with col3:
-                st.metric("Inventory Value", f"${total_value:.2f}")
+            selected_id = st.selectbox(
+                "Item details",
+                options=item_ids,
+                format_func=lambda i: f"{frame.at[i, 'product_name']} (SKU: {frame.at[i, 'sku']})",
+                key="inv_detail_item",
+            )
+            inventory_item_card(selected_id)
 
-            st.markdown("---")
+        st.markdown("---")
+        if st.button("🧹 Compact inventory database", help="Fold the write-ahead log back into inventory.db."):
+            compact_inventory()
+            st.success("Inventory database compacted")
 
-            # Search and filter
-            search = st.text_input("🔍 Search by product name or SKU", key="inv_search")
 
-            # Display inventory items
-            for item_id, item in st.session_state.inventory.items():
-                # Filter by search
-                if search and search.lower() not in item["product_name"].lower() and search.lower() not in item["sku"].lower():
-                    continue
+def main():
+    st.set_page_config(
+        page_title="Desert Candle Works Cost Calculator",
+        page_icon="🕯️",
+        layout="centered",
+    )
 
-                with st.expander(f"**{item['product_name']}** (SKU: {item['sku']})", expanded=False):
-                    col_a, col_b = st.columns(2)
+    # Light custom styling (has to be re-emitted every run; Streamlit drops
+    # elements a rerun doesn't produce)
+    st.markdown(_CSS, unsafe_allow_html=True)
 
-                    with col_a:
-                        st.write("**Product Details**")
-                        st.write(f"- Blend: {item['blend_name']}")
-                        container = st.session_state.containers.get(item['container_id'], {})
-                        container_name = container.get('name', 'Unknown')
-                        st.write(f"- Container: {container_name}")
-                        st.write(f"- Production Date: {item['production_date']}")
-                        if item.get('batch_number'):
-                            st.write(f"- Batch: {item['batch_number']}")
-
-                        st.write("\n**Recipe**")
-                        st.write(f"- Wax: {item['wax_oz']:.2f} oz")
-                        st.write(f"- Fragrance: {item['fragrance_oz']:.2f} oz")
+    init_session_state()
+    report_save_errors()
 
-                    with col_b:
-                        st.write("**Inventory**")
-                        st.write(f"- Quantity on hand: **{item['quantity']}**")
-
-                        st.write("\n**Financials**")
-                        material_cost = item['material_cost']
-                        container_cost = item.get('container_cost', 0)
-                        total_cost = material_cost + container_cost
-                        st.write(f"- Material cost: ${material_cost:.2f}")
-                        st.write(f"- Container cost: ${container_cost:.2f}")
-                        st.write(f"- Total unit cost: **${total_cost:.2f}**")
-
-                        if item.get('target_price', 0) > 0:
-                            profit = item['target_price'] - total_cost
-                            margin = (profit / item['target_price'] * 100) if item['target_price'] > 0 else 0
-                            st.write(f"- Target price: ${item['target_price']:.2f}")
-                            st.write(f"- Profit per unit: **${profit:.2f}** ({margin:.1f}%)")
-
-                    if item.get('notes'):
-                        st.write(f"\n**Notes:** {item['notes']}")
-
-                    # Action buttons
-                    st.markdown("---")
-                    col_x, col_y, col_z = st.columns(3)
-
-                    with col_x:
-                        # Adjust quantity
-                        new_qty = st.number_input(
-                            "Update quantity",
-                            min_value=0,
-                            value=item['quantity'],
-                            key=f"qty_{item_id}"
-                        )
-                        if st.button("Update", key=f"update_{item_id}"):
-                            st.session_state.inventory[item_id]['quantity'] = new_qty
-                            save_inventory_to_file(st.session_state.inventory)
-                            st.success(f"Updated quantity to {new_qty}")
-                            st.rerun()
-
-                    with col_z:
-                        if st.button("🗑️ Delete", key=f"delete_{item_id}"):
-                            del st.session_state.inventory[item_id]
-                            save_inventory_to_file(st.session_state.inventory)
-                            st.success("Item deleted")
-                            st.rerun()
+    st.title("🕯️ Desert Candle Works – Inventory Management")
+    st.caption("Calculate costs and manage your candle inventory.")
+
+    # Navigation
+    view = st.radio(
+        "View",
+        options=list(VIEWS),
+        format_func=VIEWS.get,
+        horizontal=True,
+        label_visibility="collapsed",
+        key="current_tab",
+    )
+
+    # Sidebar – global settings
+    with st.sidebar:
+        st.header("⚙️ Settings")
+        st.write("Adjust global assumptions if needed.")
+
+        wax_cost_per_oz = st.number_input(
+            "Wax cost per oz ($)",
+            min_value=0.0,
+            value=float(DEFAULT_WAX_COST_PER_OZ),
+            step=0.01,
+        )
+        water_to_wax_ratio = st.number_input(
+            "Water → Wax ratio",
+            min_value=0.5,
+            max_value=1.2,
+            value=float(DEFAULT_WATER_TO_WAX_RATIO),
+            step=0.01,
+            help="How many oz of wax fit per oz of water in your jars (default ~0.90).",
+        )
+        fragrance_load = st.slider(
+            "Fragrance load (%)",
+            min_value=4,
+            max_value=12,
+            value=int(DEFAULT_FRAGRANCE_LOAD * 100),
+            step=1,
+            help="Percentage of FO by weight (8% is your current standard).",
+        ) / 100.0
+
+        scents_block, blends_block = sidebar_lists()
+
+        st.divider()
+        st.subheader("Scents in system")
+        st.caption(scents_block)
+
+        if st.session_state.blends:
+            st.divider()
+            st.subheader("Saved blends")
+            st.caption(blends_block)
+
+    # Only the active view runs. st.tabs would execute both bodies on every
+    # rerun, so typing in the calculator would also rebuild the inventory view.
+    if view == "calculator":
+        keep_widget_state(INVENTORY_WIDGET_KEYS)
+        render_calculator(wax_cost_per_oz, water_to_wax_ratio, fragrance_load)
+    else:
+        keep_widget_state(CALCULATOR_WIDGET_KEYS)
+        render_inventory()
 
 
 if __name__ == "__main__":